@@ -3,24 +3,158 @@ from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from bs4 import BeautifulSoup
-import json
+from selenium.common.exceptions import TimeoutException
+from lxml import etree
+import lxml.html
+try:
+    from playwright.async_api import async_playwright, Error as PlaywrightError, TimeoutError as PlaywrightTimeoutError
+except ImportError:
+    async_playwright = None
+import httpx
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+import queue
+import threading
+import orjson
+import gzip
+import hashlib
 import time
+import gc
+import atexit
+import shutil
+import socket
+import subprocess
+import re
+from html import unescape
+from urllib.parse import urljoin
 import logging
+import logging.handlers
 import os
 import sys
 
-# Configure logging
+# Configure logging; records are formatted and written by a background listener thread
+stream_handler = logging.StreamHandler(sys.stdout)
+stream_handler.setFormatter(logging.Formatter('%(asctime)s - %(levelname)s - %(message)s'))
+log_queue = queue.Queue(-1)
+queue_handler = logging.handlers.QueueHandler(log_queue)
+queue_handler.setFormatter(logging.Formatter('%(message)s'))
+log_listener = logging.handlers.QueueListener(log_queue, stream_handler)
 logging.basicConfig(
     level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
     handlers=[
-        logging.StreamHandler(sys.stdout)
+        queue_handler
     ]
 )
+log_listener.start()
+atexit.register(log_listener.stop)
+# httpx logs every request at INFO; keep only its warnings
+logging.getLogger('httpx').setLevel(logging.WARNING)
 sys.stdout.reconfigure(encoding='utf-8')
 logger = logging.getLogger(__name__)
 
+BASE_URL = 'https://www.meritagehomes.com'
+USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
+MAX_CONCURRENCY = 10
+# Number of browsers (Selenium) or tabs (Playwright) for pages that need rendering
+DRIVER_POOL_SIZE = int(os.environ.get('MERITAGE_DRIVERS', 4))
+DRIVER_MAX_PAGES = 50
+# Request types aborted by the Playwright renderer
+BLOCKED_RESOURCE_TYPES = {'image', 'stylesheet', 'font', 'media'}
+CHROMEDRIVER_START_ATTEMPTS = 3
+CACHE_DIR = 'data/cache'
+CACHE_TTL = 86400  # seconds
+# Set MERITAGE_DUMP_HTML=1 to keep a copy of every fetched page for debugging. While it is
+# set, saved pages are reused on later runs regardless of age; delete them to force a refetch.
+DUMP_HTML = bool(os.environ.get('MERITAGE_DUMP_HTML'))
+
+# Tag-level patterns for pulling hrefs straight out of the markup without building a tree
+def class_tag_re(tag, name):
+    """Compile a pattern for <tag> start tags whose class attribute has the token name"""
+    token = re.escape(name)
+    return re.compile(
+        rf'<{tag}\s[^>]*?(?<![\w-])class\s*=\s*'
+        rf'(?:"(?:[^"]*\s)?{token}(?:\s[^"]*)?"'
+        rf"|'(?:[^']*\s)?{token}(?:\s[^']*)?'"
+        rf'|{token}(?=[\s/>]))[^>]*>'
+    )
+
+CITY_LINK_RE = class_tag_re('a', 'city-link')
+COMMUNITY_DIV_RE = class_tag_re('div', 'community-horizontal')
+BUTTON_LINK_RE = class_tag_re('a', 'button--blue--solid')
+DIV_TAG_RE = re.compile(r'<(/?)div\b[^>]*>')
+# Double-quoted, single-quoted or bare value; exactly one of the groups matches
+HREF_RE = re.compile(r"""\shref\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s"'>]+))""")
+
+# Compiled XPath fallbacks for markup the tag patterns miss; class tests match whole tokens
+CITY_XPATH = etree.XPath("//a[contains(concat(' ', normalize-space(@class), ' '), ' city-link ')]/@href")
+COMMUNITY_XPATH = etree.XPath(
+    "//div[contains(concat(' ', normalize-space(@class), ' '), ' community-horizontal ')]"
+    "//a[contains(concat(' ', normalize-space(@class), ' '), ' button--blue--solid ')]/@href"
+)
+
+SITEMAP_URL = f'{BASE_URL}/sitemap.xml'
+SITEMAP_PARSER = etree.XMLParser(resolve_entities=False, no_network=True)
+# Community pages live at /state/<state>/<market>/<community>
+COMMUNITY_URL_RE = re.compile('^' + re.escape(BASE_URL) + r'/state/[a-z]{2}/[^/?#]+/[^/?#]+$')
+
+_chromedriver_proc = None
+_chromedriver_url = None
+_chromedriver_lock = threading.Lock()
+
+def free_port():
+    """Return a localhost port that nothing is listening on right now"""
+    with socket.socket() as sock:
+        sock.bind(('localhost', 0))
+        return sock.getsockname()[1]
+
+def start_chromedriver():
+    """Start a shared chromedriver service once and return its URL, or None if unavailable"""
+    global _chromedriver_proc, _chromedriver_url
+    with _chromedriver_lock:
+        if _chromedriver_proc is not None:
+            return _chromedriver_url
+        path = shutil.which('chromedriver')
+        if not path:
+            return None
+        # Another process can take the free port before chromedriver binds it, so retry on a fresh one
+        for _ in range(CHROMEDRIVER_START_ATTEMPTS):
+            port = free_port()
+            proc = subprocess.Popen([path, f'--port={port}'], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+            
+            # Wait for our own service to accept connections; if it exited, whatever answers isn't ours
+            deadline = time.monotonic() + 10
+            while time.monotonic() < deadline and proc.poll() is None:
+                try:
+                    socket.create_connection(('localhost', port), timeout=1).close()
+                except OSError:
+                    time.sleep(0.1)
+                    continue
+                if proc.poll() is None:
+                    _chromedriver_proc = proc
+                    _chromedriver_url = f'http://localhost:{port}'
+                    atexit.register(stop_chromedriver)
+                    logger.info(f"Started chromedriver service on port {port}")
+                    return _chromedriver_url
+            if proc.poll() is None:
+                proc.kill()
+                proc.wait()
+            logger.warning(f"chromedriver service did not start on port {port}")
+        logger.error("chromedriver service did not start, falling back to per-driver services")
+        return None
+
+def stop_chromedriver():
+    """Stop the shared chromedriver service if it is running"""
+    global _chromedriver_proc, _chromedriver_url
+    with _chromedriver_lock:
+        if _chromedriver_proc is not None:
+            _chromedriver_proc.terminate()
+            try:
+                _chromedriver_proc.wait(timeout=5)
+            except subprocess.TimeoutExpired:
+                _chromedriver_proc.kill()
+            _chromedriver_proc = None
+            _chromedriver_url = None
+
 def setup_driver():
     """Set up Chrome driver with appropriate options"""
     chrome_options = Options()
@@ -29,108 +163,468 @@ def setup_driver():
     chrome_options.add_argument('--no-sandbox')
     chrome_options.add_argument('--disable-dev-shm-usage')
     chrome_options.add_argument('--window-size=1920,1080')
-    chrome_options.add_argument('user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36')
-    chrome_options.page_load_strategy = 'eager'
+    chrome_options.add_argument(f'user-agent={USER_AGENT}')
+    # Only anchor hrefs are needed, so skip images, stylesheets and fonts
+    chrome_options.add_argument('--blink-settings=imagesEnabled=false')
+    chrome_options.add_experimental_option('prefs', {
+        'profile.managed_default_content_settings.images': 2,
+        'profile.managed_default_content_settings.stylesheets': 2,
+        'profile.managed_default_content_settings.fonts': 2
+    })
+    # Return from driver.get immediately; callers wait for their target selector
+    chrome_options.page_load_strategy = 'none'
+    
+    # Open a session on the shared chromedriver service instead of spawning a new one
+    service_url = start_chromedriver()
+    if service_url:
+        return webdriver.Remote(command_executor=service_url, options=chrome_options)
     return webdriver.Chrome(options=chrome_options)
 
-def get_city_links():
+async def fetch(client, url, semaphore):
+    """Fetch a page over HTTP and return its HTML, or None on failure"""
+    async with semaphore:
+        try:
+            response = await client.get(url)
+            response.raise_for_status()
+            return response.text
+        except httpx.HTTPError as e:
+            logger.error(f"Error fetching {url}: {str(e)}")
+            return None
+
+class DriverPool:
+    """Pool of reusable Chrome drivers, started on demand up to a fixed size"""
+
+    name = 'Selenium'
+
+    def __init__(self, size):
+        self.size = size
+        self.executor = ThreadPoolExecutor(max_workers=size)
+        self._idle = queue.Queue()
+        self._drivers = []
+        self._pages = {}
+        self._lock = threading.Lock()
+
+    def get(self):
+        """Check out an idle driver, starting a new one while below pool size"""
+        while True:
+            try:
+                return self._idle.get_nowait()
+            except queue.Empty:
+                pass
+            with self._lock:
+                start_new = len(self._drivers) < self.size
+                if start_new:
+                    self._drivers.append(None)
+            if start_new:
+                break
+            # Re-check periodically, a recycled driver frees its slot without returning to the queue
+            try:
+                return self._idle.get(timeout=1)
+            except queue.Empty:
+                continue
+        try:
+            driver = setup_driver()
+        except Exception:
+            with self._lock:
+                self._drivers.remove(None)
+            raise
+        with self._lock:
+            self._drivers[self._drivers.index(None)] = driver
+        return driver
+
+    def put(self, driver):
+        """Return a driver to the pool, retiring it after DRIVER_MAX_PAGES pages"""
+        with self._lock:
+            self._pages[driver] = self._pages.get(driver, 0) + 1
+            retire = self._pages[driver] >= DRIVER_MAX_PAGES
+            if retire:
+                self._drivers.remove(driver)
+                del self._pages[driver]
+        if not retire:
+            self._idle.put(driver)
+            return
+        # Chrome's memory grows over long sessions; the next get() starts a fresh driver
+        logger.info(f"Recycling driver after {DRIVER_MAX_PAGES} pages")
+        self._quit(driver)
+        gc.collect()
+
+    def _quit(self, driver):
+        """Quit a driver, logging rather than raising on failure"""
+        try:
+            driver.quit()
+        except Exception as e:
+            logger.error(f"Error closing driver: {str(e)}")
+
+    async def render(self, url, selector):
+        """Render a page on a pool thread and return its HTML"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, self.render_blocking, url, selector)
+
+    def render_blocking(self, url, selector):
+        """Render a page with a pooled Selenium driver and return its HTML"""
+        driver = self.get()
+        try:
+            driver.get(url)
+            try:
+                WebDriverWait(driver, 15).until(EC.presence_of_element_located((By.CSS_SELECTOR, selector)))
+            except TimeoutException:
+                logger.warning(f"Timed out waiting for '{selector}' on {url}, using page as loaded")
+            return driver.page_source
+        finally:
+            self.put(driver)
+
+    async def close(self):
+        """Stop the worker threads and quit every driver"""
+        await asyncio.to_thread(self._close)
+
+    def _close(self):
+        self.executor.shutdown(wait=True)
+        for driver in self._drivers:
+            if driver is not None:
+                self._quit(driver)
+        self._drivers.clear()
+        self._pages.clear()
+        gc.collect()
+
+class PlaywrightRenderer:
+    """Render pages in one shared Playwright browser context, blocking non-document assets"""
+
+    def __init__(self, size):
+        self.size = size
+        self._semaphore = asyncio.Semaphore(size)
+        self._start_lock = asyncio.Lock()
+        self._playwright = None
+        self._browser = None
+        self._context = None
+        self._fallback = None
+
+    @property
+    def name(self):
+        """The browser actually doing the rendering"""
+        return 'Playwright' if self._fallback is None else self._fallback.name
+
+    async def _start(self):
+        """Launch the browser and context on first use, or fall back to Selenium if that fails"""
+        async with self._start_lock:
+            if self._context is not None or self._fallback is not None:
+                return
+            try:
+                self._playwright = await async_playwright().start()
+                self._browser = await self._playwright.chromium.launch(headless=True)
+                self._context = await self._browser.new_context(user_agent=USER_AGENT)
+                await self._context.route('**/*', self._route)
+                logger.info("Started Playwright browser")
+            except PlaywrightError as e:
+                # Typically the browser binaries were never installed with `playwright install chromium`
+                logger.error(f"Could not start Playwright, falling back to Selenium: {str(e).splitlines()[0]}")
+                if self._playwright is not None:
+                    await self._playwright.stop()
+                self._playwright = self._browser = self._context = None
+                self._fallback = DriverPool(self.size)
+
+    async def _route(self, route):
+        """Abort requests for assets the link extraction does not need"""
+        if route.request.resource_type in BLOCKED_RESOURCE_TYPES:
+            await route.abort()
+        else:
+            await route.continue_()
+
+    async def render(self, url, selector):
+        """Render a page in a new tab and return its HTML"""
+        await self._start()
+        if self._fallback is not None:
+            return await self._fallback.render(url, selector)
+        async with self._semaphore:
+            page = await self._context.new_page()
+            try:
+                await page.goto(url, wait_until='domcontentloaded')
+                try:
+                    await page.wait_for_selector(selector, state='attached', timeout=15000)
+                except PlaywrightTimeoutError:
+                    logger.warning(f"Timed out waiting for '{selector}' on {url}, using page as loaded")
+                return await page.content()
+            finally:
+                await page.close()
+
+    async def close(self):
+        """Close the context, browser and Playwright driver"""
+        if self._fallback is not None:
+            await self._fallback.close()
+        if self._context is not None:
+            await self._context.close()
+            await self._browser.close()
+            await self._playwright.stop()
+            self._context = None
+
+def make_renderer():
+    """Use Playwright for JS-rendered pages when installed, otherwise a Selenium driver pool"""
+    if async_playwright is not None:
+        return PlaywrightRenderer(DRIVER_POOL_SIZE)
+    return DriverPool(DRIVER_POOL_SIZE)
+
+def cache_path(url):
+    """Path of the on-disk cache entry for a URL"""
+    return os.path.join(CACHE_DIR, hashlib.sha1(url.encode('utf-8')).hexdigest() + '.html.gz')
+
+def read_cache(url):
+    """Return cached HTML for a URL if present and fresh, otherwise None"""
+    path = cache_path(url)
+    try:
+        if time.time() - os.path.getmtime(path) > CACHE_TTL:
+            return None
+        with gzip.open(path, 'rt', encoding='utf-8') as f:
+            return f.read()
+    except (OSError, EOFError):
+        return None
+
+def write_cache(url, html):
+    """Store page HTML in the on-disk cache"""
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        # Cache entries live a day at most, so favour speed over ratio
+        with gzip.open(cache_path(url), 'wb', compresslevel=1) as f:
+            f.write(html.encode('utf-8'))
+    except OSError as e:
+        logger.error(f"Error caching {url}: {str(e)}")
+
+def read_dump(path):
+    """Return page HTML saved by an earlier run at path + '.gz', or None"""
+    try:
+        with gzip.open(path + '.gz', 'rt', encoding='utf-8') as f:
+            return f.read()
+    except FileNotFoundError:
+        return None
+    except (OSError, EOFError) as e:
+        logger.error(f"Error reading saved page {path}.gz: {str(e)}")
+        return None
+
+async def get_page(client, url, semaphore, renderer, marker, selector, dump_path):
+    """Get page HTML from a saved dump, the cache or HTTP, falling back to a browser when marker is missing"""
+    html = read_dump(dump_path) if DUMP_HTML else None
+    if html is not None:
+        logger.info(f"Using saved page {dump_path}: {url}")
+        return html
+    
+    html = read_cache(url)
+    if html is not None:
+        logger.info(f"Using cached page: {url}")
+        return html
+    
+    html = await fetch(client, url, semaphore)
+    if html is None or marker not in html:
+        logger.info(f"'{marker}' not found in HTTP response, rendering with {renderer.name}: {url}")
+        try:
+            html = await renderer.render(url, selector)
+        except Exception as e:
+            logger.error(f"Error rendering {url}: {str(e)}")
+            return None
+    await asyncio.to_thread(write_cache, url, html)
+    return html
+
+def absolutize(href, page_url):
+    """Return an href as an absolute URL, resolving relative paths against the page it came from"""
+    if href.startswith(('http://', 'https://')):
+        return href
+    # Plain root-relative paths on our own pages are by far the common case and need no urljoin
+    if href.startswith('/') and not href.startswith('//') and '/.' not in href and page_url.startswith(BASE_URL + '/'):
+        return BASE_URL + href
+    return urljoin(page_url, href)
+
+def tag_hrefs(pattern, html, start=0, end=None):
+    """Return the href of every tag matched by pattern in html[start:end]"""
+    hrefs = []
+    for tag in pattern.finditer(html, start, len(html) if end is None else end):
+        href_match = HREF_RE.search(tag.group(0))
+        if href_match:
+            hrefs.append(unescape(href_match.group(href_match.lastindex)))
+    return hrefs
+
+def parse_tree(html):
+    """Parse page HTML into an lxml tree"""
+    try:
+        return lxml.html.fromstring(html)
+    except ValueError:
+        # lxml refuses str input that carries an XML encoding declaration
+        return lxml.html.fromstring(html.encode('utf-8'))
+
+def extract_city_hrefs(html):
+    """Extract city link hrefs, falling back to lxml when the regex finds none"""
+    hrefs = tag_hrefs(CITY_LINK_RE, html)
+    if not hrefs:
+        hrefs = [str(href) for href in CITY_XPATH(parse_tree(html))]
+    return hrefs
+
+def extract_community_hrefs(html):
+    """Extract community button hrefs, falling back to lxml when the regex finds none"""
+    hrefs = []
+    for container in COMMUNITY_DIV_RE.finditer(html):
+        # Walk div open/close tags to find where this container ends
+        depth = 1
+        end = len(html)
+        for div in DIV_TAG_RE.finditer(html, container.end()):
+            depth += -1 if div.group(1) else 1
+            if depth == 0:
+                end = div.start()
+                break
+        hrefs.extend(tag_hrefs(BUTTON_LINK_RE, html, container.end(), end))
+    if not hrefs:
+        hrefs = [str(href) for href in COMMUNITY_XPATH(parse_tree(html))]
+    return hrefs
+
+def dump_html(path, html):
+    """Save page HTML gzip-compressed to path + '.gz'"""
+    try:
+        with gzip.open(path + '.gz', 'wb', compresslevel=1) as f:
+            f.write(html.encode('utf-8'))
+    except OSError as e:
+        logger.error(f"Error saving {path}.gz: {str(e)}")
+
+async def get_city_links(client, semaphore, renderer):
     """Get initial city links from Meritage Homes website"""
-    url = "https://www.meritagehomes.com/homes"
-    driver = setup_driver()
+    url = f"{BASE_URL}/homes"
     city_links = []
+    seen = set()
     
     try:
         logger.info("Starting to fetch initial page...")
-        driver.get(url)
-        wait = WebDriverWait(driver, 30)
-        time.sleep(5)
-        
-        # Save initial page HTML
-        os.makedirs('data', exist_ok=True)
-        with open('data/meritage_initial.html', 'w', encoding='utf-8') as f:
-            f.write(driver.page_source)
-        logger.info("Initial page HTML has been saved")
+        dump_path = 'data/meritage_initial.html'
+        html = await get_page(client, url, semaphore, renderer, 'city-link', 'a.city-link', dump_path)
+        if html is None:
+            return []
         
-        # Parse page to get links
-        soup = BeautifulSoup(driver.page_source, 'html.parser')
+        # Save initial page HTML in the background while links are parsed
+        dump = None
+        if DUMP_HTML and not os.path.exists(dump_path + '.gz'):
+            os.makedirs('data', exist_ok=True)
+            dump = asyncio.create_task(asyncio.to_thread(dump_html, dump_path, html))
         
         # Find all city-link class elements
-        city_elements = soup.find_all('a', class_='city-link')
-        for element in city_elements:
-            href = element.get('href')
-            if href:
-                if not href.startswith('http'):
-                    href = 'https://www.meritagehomes.com' + href
-                if href not in city_links:
-                    city_links.append(href)
-                    logger.info(f"Found city link: {href}")
+        for href in [absolutize(href, url) for href in extract_city_hrefs(html) if href]:
+            if href not in seen:
+                seen.add(href)
+                city_links.append(href)
+                logger.debug(f"Found city link: {href}")
         
         logger.info(f"Total city links found: {len(city_links)}")
+        if dump:
+            await dump
+            logger.info("Initial page HTML has been saved")
         return city_links
         
     except Exception as e:
         logger.error(f"Error getting city links: {str(e)}")
         return []
+
+def parse_community_links(html, page_url):
+    """Parse the absolute community links out of the city page at page_url"""
+    # Find button--blue--solid links within community-horizontal containers
+    return [absolutize(href, page_url) for href in extract_community_hrefs(html) if href]
+
+async def process_city(client, semaphore, renderer, url):
+    """Fetch one city page and return the community links on it"""
+    filename = url.rstrip('/').split('/')[-1] or 'index'
+    dump_path = f'data/meritage_{filename}.html'
+    dump = None
+    # One bad city must not take the whole gather down with it
+    try:
+        html = await get_page(client, url, semaphore, renderer, 'community-horizontal', 'div.community-horizontal', dump_path)
+        logger.info(f"Processing URL: {url}")
+        if html is None:
+            return []
+        
+        # Save the page's HTML in the background while it is parsed
+        if DUMP_HTML and not os.path.exists(dump_path + '.gz'):
+            dump = asyncio.create_task(asyncio.to_thread(dump_html, dump_path, html))
+        return parse_community_links(html, url)
+    except Exception as e:
+        logger.error(f"Error processing URL {url}: {str(e)}")
+        return []
     finally:
-        driver.quit()
+        if dump:
+            await dump
 
-def get_community_links(city_links):
+async def get_community_links(client, semaphore, renderer, city_links):
     """Get community links from each city page"""
-    driver = setup_driver()
     community_links = []
+    seen = set()
     
     try:
-        for url in city_links:
-            logger.info(f"Processing URL: {url}")
-            try:
-                driver.get(url)
-                time.sleep(5)
-                
-                # Save each page's HTML
-                filename = url.rstrip('/').split('/')[-1] or 'index'
-                with open(f'data/meritage_{filename}.html', 'w', encoding='utf-8') as f:
-                    f.write(driver.page_source)
-                
-                # Parse page to get community links
-                soup = BeautifulSoup(driver.page_source, 'html.parser')
-                
-                # Find all community-horizontal containers
-                community_containers = soup.find_all('div', class_='community-horizontal')
-                for container in community_containers:
-                    # Find button--blue--solid links within each container
-                    links = container.find_all('a', class_='button--blue--solid')
-                    for link in links:
-                        href = link.get('href')
-                        if href:
-                            if not href.startswith('http'):
-                                href = 'https://www.meritagehomes.com' + href
-                            if href not in community_links:
-                                community_links.append(href)
-                                logger.info(f"Found community link: {href}")
-            
-            except Exception as e:
-                logger.error(f"Error processing URL {url}: {str(e)}")
-                continue
+        # Each city page is parsed as soon as it arrives; results are merged in city order
+        results = await asyncio.gather(*[process_city(client, semaphore, renderer, url) for url in city_links])
+        for hrefs in results:
+            for href in hrefs:
+                if href not in seen:
+                    seen.add(href)
+                    community_links.append(href)
+                    logger.debug(f"Found community link: {href}")
         
-        return list(set(community_links))  # Remove duplicates
+        return community_links
     except Exception as e:
         logger.error(f"Error getting community links: {str(e)}")
         return []
+
+async def fetch_sitemap(client, url, semaphore):
+    """Fetch a sitemap and return its root element, or None on failure"""
+    async with semaphore:
+        try:
+            response = await client.get(url)
+            response.raise_for_status()
+            return etree.fromstring(response.content, SITEMAP_PARSER)
+        except (httpx.HTTPError, etree.XMLSyntaxError) as e:
+            logger.error(f"Error fetching sitemap {url}: {str(e)}")
+            return None
+
+async def discover_via_sitemap(client, semaphore):
+    """Get community links listed in the sitemap, following one level of sitemap index"""
+    root = await fetch_sitemap(client, SITEMAP_URL, semaphore)
+    if root is None:
+        return []
+    
+    roots = [root]
+    if etree.QName(root).localname == 'sitemapindex':
+        sitemap_urls = [loc.text.strip() for loc in root.iter('{*}loc') if loc.text]
+        sitemaps = await asyncio.gather(*[fetch_sitemap(client, url, semaphore) for url in sitemap_urls])
+        roots = [sitemap for sitemap in sitemaps if sitemap is not None]
+    
+    community_links = []
+    seen = set()
+    for sitemap in roots:
+        for loc in sitemap.iter('{*}loc'):
+            url = (loc.text or '').strip().rstrip('/')
+            if COMMUNITY_URL_RE.match(url) and url not in seen:
+                seen.add(url)
+                community_links.append(url)
+    logger.info(f"Found {len(community_links)} community links in sitemap")
+    return community_links
+
+async def crawl():
+    """Get community links from the sitemap, or by crawling city pages over one shared HTTP client"""
+    semaphore = asyncio.Semaphore(MAX_CONCURRENCY)
+    renderer = make_renderer()
+    try:
+        async with httpx.AsyncClient(http2=True, headers={'User-Agent': USER_AGENT}, timeout=30, follow_redirects=True) as client:
+            community_links = await discover_via_sitemap(client, semaphore)
+            if community_links:
+                return community_links
+            logger.info("No community links in sitemap, crawling city pages")
+            
+            # Get city links
+            city_links = await get_city_links(client, semaphore, renderer)
+            logger.info(f"Found {len(city_links)} city links")
+            
+            if not city_links:
+                logger.error("No city links found")
+                return []
+            
+            # Get community links
+            return await get_community_links(client, semaphore, renderer, city_links)
     finally:
-        driver.quit()
+        await renderer.close()
+        stop_chromedriver()
 
 def main():
     try:
-        # Get city links
-        city_links = get_city_links()
-        logger.info(f"Found {len(city_links)} city links")
-        
-        if not city_links:
-            logger.error("No city links found")
-            return
-        
-        # Get community links
-        community_links = get_community_links(city_links)
+        community_links = asyncio.run(crawl())
         logger.info(f"Found {len(community_links)} community links")
         
         if not community_links:
@@ -138,8 +632,8 @@ def main():
             return
         
         # Save links to JSON file
-        with open('meritage_links.json', 'w', encoding='utf-8') as f:
-            json.dump(community_links, f, indent=2, ensure_ascii=False)
+        with open('meritage_links.json', 'wb') as f:
+            f.write(orjson.dumps(community_links, option=orjson.OPT_INDENT_2))
         logger.info("Links have been saved to meritage_links.json")
         
     except Exception as e:
@@ -1,10 +1,14 @@
-from selenium import webdriver
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from bs4 import BeautifulSoup
+# selenium.webdriver and requests_cache are imported where they are first needed, so that
+# --help, runs with nothing left to scrape and library use don't pay for them
+from selenium.common.exceptions import TimeoutException, WebDriverException
+from lxml import etree
+import lxml.html
+from urllib.parse import urlsplit, urlunsplit
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import json
+import orjson
 import time
 import logging
 import os
@@ -12,7 +16,11 @@ import sys
 from datetime import datetime
 import re
 import argparse
+import functools
 import random
+import threading
+import queue
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 # Configure logging
 logging.basicConfig(
@@ -25,31 +33,200 @@ logging.basicConfig(
 sys.stdout.reconfigure(encoding='utf-8')
 logger = logging.getLogger(__name__)
 
+USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
+# Sample communities; the first is scraped when neither --url nor --batch is given
+DEFAULT_URLS = (
+    "https://www.meritagehomes.com/state/al/huntsville/madison-preserve-the-estate-series",
+    "https://www.meritagehomes.com/state/az/phoenix/heritage-at-maricopa",
+    "https://www.meritagehomes.com/state/ca/sacramento/madison-at-ten-trails"
+)
+
+# Community URLs finished by earlier --batch runs, kept in the output directory
+DONE_FILE = '.meritage_done.json'
+
+# Batch output goes through one writer thread, with at most this many files queued
+WRITE_QUEUE_SIZE = 64
+
+# Connect and read timeouts for homesite and plan page requests
+HTTP_TIMEOUT = (5, 30)
+# Homesite and plan responses are cached on disk when requests-cache is installed
+CACHE_FILE = 'data/cache/meritage_pages.sqlite'
+CACHE_TTL = 86400  # seconds
+# Homesite and plan pages downloaded at once, across all batch threads; also the session's connection pool size
+SUBPAGE_CONCURRENCY = 8
+
+# Patterns used on every page, compiled once
+PRICE_RE = re.compile(r'\$[\d,]+')
+BEDS_RE = re.compile(r'(\d+)\s*(?:Bedroom|Bed|BR)')
+BATHS_RE = re.compile(r'(\d+(?:\.\d+)?)\s*(?:Bathroom|Bath|BA)')
+SQFT_RE = re.compile(r'([\d,]+)\s*sq\s*ft', re.IGNORECASE)
+# Both alternatives start with a literal prefix, so one pass finds the first of each
+PAGE_SUMMARY_RE = re.compile(
+    r'Starting at\s+(?P<price>\$[\d,]+)'
+    r'|Approx\.\s+Sq\.\s+Ft\.\s+(?P<sqft_min>[\d,]+)\s*-\s*(?P<sqft_max>[\d,]+)'
+)
+# Bed count, bath count and square footage from a home card's bottom-details text in one scan
+BOTTOM_DETAILS_RE = re.compile(r'Bed\s+(?P<bed>\d+)|Bath\s+(?P<bath>\d+)|Approx\.\s+(?P<sqft>[\d,]+)\s+sq\.\s+ft\.')
+ZIP_TAIL_RE = re.compile(r'\s+\d{5}$')
+WS_RE = re.compile(r'\s+')
+LAZY_IMG_SRC_RE = re.compile(r'<img[^>]*src="([^"]*)"')
+
+# Homesite article paragraphs containing these are headers, not the overview
+OVERVIEW_SKIP_SUBSTRINGS = ('Estimated Completion', 'Home Address')
+
+# Community detail column headings and the details fields they fill
+DETAIL_RANGE_FIELDS = {
+    'Bedrooms': 'bed_range',
+    'Full Bathrooms': 'bath_range',
+    'Stories': 'stories_range'
+}
+
+def has_class(name):
+    """XPath predicate matching elements that carry the given class token"""
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')"
+
+def first(nodes):
+    """Return the first node of an XPath result, or None if it is empty"""
+    return nodes[0] if nodes else None
+
+# XPaths for the per-record lookups, compiled once so the traversal runs inside lxml
+QMI_XPATH = etree.XPath(f"(//section[@aria-label='Quick Move Ins'])[1]//div[{has_class('qmi-vertical')}]")
+PLAN_XPATH = etree.XPath("//div[normalize-space(@class)='row columns collapse floorplan-vertical']")
+SLIDE_XPATH = etree.XPath("//li[normalize-space(@class)='slick-slide orbit-slide']")
+DETAIL_COLUMN_XPATH = etree.XPath("//div[normalize-space(@class)='small-6 medium-6 large-3 column']")
+PLAN_COLUMN_XPATH = etree.XPath("//div[normalize-space(@class)='small-6 medium-6 large-4 column']")
+FEATURE_SECTION_XPATH = etree.XPath("//div[normalize-space(@class)='small-12 large-6 column text align-middle text-left']")
+NEARBY_GROUP_XPATH = etree.XPath(f"//div[{has_class('multicol')}]")
+NEARBY_PLACE_XPATH = etree.XPath(f".//span[{has_class('plain')}]")
+CONTENT_XPATH = etree.XPath(f"(.//div[{has_class('content')}])[1]")
+MID_XPATH = etree.XPath(f"(.//div[{has_class('mid')}])[1]")
+IMAGE_XPATH = etree.XPath(f"(.//div[{has_class('image')}])[1]")
+TOP_DETAILS_XPATH = etree.XPath(f"(.//div[{has_class('top-details')}])[1]")
+BOTTOM_DETAILS_XPATH = etree.XPath(f"(.//div[{has_class('bottom-details')}])[1]")
+HIDDEN_IMAGE_XPATH = etree.XPath(f"(.//span[{has_class('hidden-image')}])[1]")
+ORBIT_IMAGE_XPATH = etree.XPath(f"(.//img[{has_class('orbit-image')}])[1]")
+TABS_PANEL_XPATH = etree.XPath(f"(.//div[{has_class('tabs-panel')}])[1]")
+NEXT_SPAN_XPATH = etree.XPath("following-sibling::span[1]")
+MAP_LINK_XPATH = etree.XPath(f"(.//a[{has_class('plain')} and contains(@href, 'maps.google.com')])[1]")
+# Page text the way BeautifulSoup reports it, leaving out script and style bodies
+PAGE_TEXT_XPATH = etree.XPath("//text()[not(ancestor::script or ancestor::style)]", smart_strings=False)
+# Elements whose presence shows a homesite or plan page came back with its content
+SITE_READY_XPATH = etree.XPath(f"//article[{has_class('small-12')} and {has_class('medium-10')} and {has_class('large-8')}]")
+PLAN_READY_XPATH = etree.XPath(f"//div[{has_class('tabs-content')}] | //div[{has_class('small-12')} and {has_class('large-6')} and {has_class('column')} and {has_class('text')}]")
+
 def setup_driver():
     """Set up Chrome driver with appropriate options"""
+    from selenium import webdriver
+    from selenium.webdriver.chrome.options import Options
     chrome_options = Options()
     chrome_options.add_argument('--headless')
     chrome_options.add_argument('--disable-gpu')
     chrome_options.add_argument('--no-sandbox')
     chrome_options.add_argument('--disable-dev-shm-usage')
     chrome_options.add_argument('--window-size=1920,1080')
-    chrome_options.add_argument('user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36')
+    chrome_options.add_argument(f'user-agent={USER_AGENT}')
+    # Only DOM text and attribute values are scraped, so skip image and font downloads;
+    # stylesheets stay on in case the page's lazy-loading scripts depend on layout
+    chrome_options.add_argument('--blink-settings=imagesEnabled=false')
+    chrome_options.add_experimental_option('prefs', {
+        'profile.managed_default_content_settings.images': 2,
+        'profile.managed_default_content_settings.stylesheets': 1,
+        'profile.managed_default_content_settings.fonts': 2,
+        'profile.default_content_setting_values.notifications': 2
+    })
     chrome_options.page_load_strategy = 'eager'
     return webdriver.Chrome(options=chrome_options)
 
+def wait_for(driver, selector, timeout=10):
+    """Wait until an element matching selector is present, sleeping briefly if it never appears"""
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.support.ui import WebDriverWait
+    from selenium.webdriver.support import expected_conditions as EC
+    try:
+        WebDriverWait(driver, timeout).until(EC.presence_of_element_located((By.CSS_SELECTOR, selector)))
+    except TimeoutException:
+        logger.warning(f"Timed out waiting for '{selector}', continuing with page as loaded")
+        time.sleep(2)
+
+@functools.cache
+def cached_session_class():
+    """Return requests_cache.CachedSession, or None when requests-cache isn't installed"""
+    try:
+        from requests_cache import CachedSession
+    except ImportError:
+        return None
+    return CachedSession
+
+def make_session():
+    """Create the keep-alive HTTP session used for homesite and plan pages, retrying transient errors"""
+    CachedSession = cached_session_class()
+    if CachedSession:
+        # Honors Cache-Control/ETag headers, otherwise reuses responses for CACHE_TTL
+        session = CachedSession(CACHE_FILE, backend='sqlite', expire_after=CACHE_TTL,
+                                cache_control=True, allowable_methods=('GET',))
+        session.cache.delete(expired=True)
+    else:
+        session = requests.Session()
+    # Exponential backoff with jitter on 429/5xx, waiting out any Retry-After the server sends
+    retry = Retry(total=5, backoff_factor=0.5, backoff_max=30, backoff_jitter=0.5,
+                  status_forcelist=[429, 500, 502, 503, 504], respect_retry_after_header=True)
+    session.mount('https://', HTTPAdapter(pool_connections=1, pool_maxsize=SUBPAGE_CONCURRENCY, max_retries=retry))
+    session.headers.update({'User-Agent': USER_AGENT, 'Accept-Encoding': 'gzip, deflate'})
+    return session
+
+def response_parser(response):
+    """Return an HTML parser for the charset the response headers declare, or None to let lxml detect it"""
+    # requests falls back to ISO-8859-1 for any text/* response, so only trust an explicit charset
+    if 'charset=' not in response.headers.get('Content-Type', '').lower():
+        return None
+    try:
+        return lxml.html.HTMLParser(encoding=response.encoding)
+    except LookupError:
+        return None
+
+def download_subpage(session, url):
+    """Fetch a homesite or plan page over HTTP and parse it, returning None if that fails"""
+    try:
+        response = session.get(url, timeout=HTTP_TIMEOUT)
+        response.raise_for_status()
+        return lxml.html.fromstring(response.content, parser=response_parser(response))
+    except (requests.RequestException, etree.LxmlError) as e:
+        logger.warning(f"HTTP fetch failed for {url}: {str(e)}, loading it in the browser")
+        return None
+
+# Shared by every community (and batch thread) so subpage downloads are bounded globally;
+# its threads are only started once work is submitted
+SUBPAGE_EXECUTOR = ThreadPoolExecutor(max_workers=SUBPAGE_CONCURRENCY, thread_name_prefix='subpage')
+
+def download_subpages(session, urls):
+    """Download homesite and plan pages concurrently on the shared subpage pool, keyed by URL"""
+    urls = list(dict.fromkeys(urls))
+    roots = SUBPAGE_EXECUTOR.map(functools.partial(download_subpage, session), urls)
+    return dict(zip(urls, roots))
+
+def fetch_subpage(url, driver, root, selector, ready_xpath):
+    """Return a downloaded homesite or plan page, loading it in the browser if the download failed or lacks its content"""
+    if root is not None:
+        if ready_xpath(root):
+            return root
+        logger.warning(f"Expected content missing from {url}, loading it in the browser")
+    driver.get(url)
+    wait_for(driver, selector)
+    return lxml.html.fromstring(driver.page_source)
+
 def extract_price(text):
     """Extract price from text"""
     if not text:
         return None
-    price_match = re.search(r'\$[\d,]+', text)
+    price_match = PRICE_RE.search(text)
     return price_match.group(0) if price_match else None
 
 def extract_beds_baths(text):
     """Extract number of beds and baths from text"""
     if not text:
         return None, None
-    beds_match = re.search(r'(\d+)\s*(?:Bedroom|Bed|BR)', text)
-    baths_match = re.search(r'(\d+(?:\.\d+)?)\s*(?:Bathroom|Bath|BA)', text)
+    beds_match = BEDS_RE.search(text)
+    baths_match = BATHS_RE.search(text)
     beds = beds_match.group(1) if beds_match else None
     baths = baths_match.group(1) if baths_match else None
     return beds, baths
@@ -58,49 +235,220 @@ def extract_sqft(text):
     """Extract square footage from text"""
     if not text:
         return None
-    sqft_match = re.search(r'([\d,]+)\s*sq\s*ft', text.lower())
+    sqft_match = SQFT_RE.search(text)
     return sqft_match.group(1).replace(',', '') if sqft_match else None
 
-def extract_article_content(soup):
+def extract_bottom_details(text):
+    """Map bed, bath and sqft to the first value of each found in bottom-details text"""
+    details = {}
+    for match in BOTTOM_DETAILS_RE.finditer(text):
+        details.setdefault(match.lastgroup, match.group(match.lastgroup))
+    return details
+
+def extract_article_content(root):
     """Extract text content from p tags under article with specific class"""
     article_content = []
-    article = soup.find('article', attrs={'class': 'small-12 medium-10 large-8 column text-center'})
-    if article:
-        for p in article.find_all('p'):
-            text = p.text.strip()
+    article = first(root.xpath("//article[normalize-space(@class)='small-12 medium-10 large-8 column text-center']"))
+    if article is not None:
+        for p in article.iter('p'):
+            text = p.text_content().strip()
             if text:  # Only add non-empty text
                 article_content.append(text)
         logger.info(f"Found {len(article_content)} paragraphs in article")
     return article_content[0]
 
-def fetch_page(url, output_dir='data/meritagehomes'):
-    """Fetch and parse page data"""
-    driver = None
+def canonical_url(url):
+    """Normalize a community URL so spellings that differ only in host case, fragment or trailing slash match"""
+    parts = urlsplit(url.strip())
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), parts.path.rstrip('/'), parts.query, ''))
+
+def load_done_urls(done_file):
+    """Read the set of community URLs finished by earlier batch runs"""
+    try:
+        with open(done_file, 'rb') as f:
+            return set(orjson.loads(f.read()))
+    except FileNotFoundError:
+        return set()
+    except orjson.JSONDecodeError as e:
+        logger.warning(f"Ignoring unreadable {done_file}: {str(e)}")
+        return set()
+
+def save_done_urls(done_file, done):
+    """Write the finished community URLs, replacing the file atomically"""
+    data = orjson.dumps(sorted(done), option=orjson.OPT_INDENT_2)
+    tmp_file = f"{done_file}.tmp"
+    with open(tmp_file, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_file, done_file)
+
+def write_file(path, data, writer=None, done_url=None):
+    """Write bytes to path, handing them to the background writer when one is given; the writer records done_url once written"""
+    if writer:
+        writer.write(path, data, done_url)
+        return
+    with open(path, 'wb', buffering=1 << 20) as f:
+        f.write(data)
+
+def json_path(url, output_dir='data/meritagehomes'):
+    """Return the JSON output path for a community URL"""
+    return f"{output_dir}/json/meritage_{url.split('/')[-1]}.json"
+
+def parse_homesite_page(homesite, site_root):
+    """Fill a homesite record with coordinates, overview and images from its detail page"""
+    # Extract coordinates and overview from article
+    content_section = first(site_root.xpath("//article[normalize-space(@class)='small-12 medium-10 large-8 column text-center pad-bottom-2']"))
+    if content_section is not None:
+        # Find map link and extract coordinates
+        map_link = first(MAP_LINK_XPATH(content_section))
+        if map_link is not None:
+            # The destination is a plain "daddr=<lat>,<lon>" query parameter
+            _, _, daddr = map_link.get('href').partition('daddr=')
+            lat, _, lon = daddr.partition('&')[0].partition(',')
+            lat, lon = lat.strip(), lon.strip()
+            try:
+                # The range test also rejects nan/inf, which float() happily accepts
+                valid = -90 <= float(lat) <= 90 and -180 <= float(lon) <= 180
+            except ValueError:
+                valid = False
+            if valid:
+                homesite["latitude"] = lat
+                homesite["longitude"] = lon
+                logger.info(f"Found coordinates: {homesite['latitude']}, {homesite['longitude']}")
+            else:
+                logger.warning(f"Ignoring malformed map coordinates: {daddr!r}")
+
+        # Extract overview - it's the p tag that contains text about the home description
+        for p in content_section.iter('p'):
+            p_text = p.text_content().strip()
+            # Skip empty paragraphs, plan numbers and specific headers
+            if not p_text or p_text.startswith('Plan #') or any(s in p_text for s in OVERVIEW_SKIP_SUBSTRINGS):
+                continue
+            homesite["overview"] = p_text
+            logger.info(f"Found overview: {homesite['overview'][:50]}...")
+            break
+
+    # Extract images - handle both regular and lazy loaded images
+    for slide in SLIDE_XPATH(site_root):
+        # First try to get lazy loaded image
+        hidden_img = first(HIDDEN_IMAGE_XPATH(slide))
+        if hidden_img is not None and hidden_img.get('data-lazy'):
+            src = hidden_img.get('data-lazy')
+            if src and not src.startswith('http'):
+                src = 'https://www.meritagehomes.com' + src
+            homesite["images"].append(src)
+        else:
+            # Try regular image as fallback
+            img = first(ORBIT_IMAGE_XPATH(slide))
+            if img is not None:
+                src = img.get('src') or img.get('data-csrc')
+                if src and not src.startswith('http') and not src.endswith('meritageLoadingCommunityHero.gif'):
+                    src = 'https://www.meritagehomes.com' + src
+                    homesite["images"].append(src)
+
+    logger.info(f"Found {len(homesite['images'])} images")
+
+def parse_plan_page(homeplan, plan_root):
+    """Fill a home plan record with included features, half baths and floorplans from its detail page"""
+    # Initialize includedFeatures array
+    homeplan["includedFeatures"] = []
+
+    # Extract included features from multicol decorated
+    feature_sections = FEATURE_SECTION_XPATH(plan_root)
+    logger.info(f"feature_sections------------: {len(feature_sections)}")
+
+    # Collect each section's list items once, then count them to determine section distribution
+    section_items = []
+    for section in feature_sections:
+        ul = section.find('.//ul')
+        section_items.append(ul.findall('.//li') if ul is not None else [])
+    total_features = sum(len(items) for items in section_items)
+    logger.info(f"total_features------------: {total_features}")
+
+    # Calculate features per section (roughly divide by 4); with fewer than 4 features each one gets its own section
+    features_per_section = max(total_features // 4, 1)
+    logger.info(f"features_per_section------------: {features_per_section}")
+    current_section = 0
+    feature_count = 0
+
+    # Extract features and assign section indexes
+    for items in section_items:
+        for li in items:
+            feature_text = li.text_content().strip()
+            if feature_text:
+                homeplan["includedFeatures"].append({
+                    "description": feature_text,
+                    "section_index": current_section
+                })
+                feature_count += 1
+                # Update section index when count exceeds per-section limit
+                if feature_count >= (current_section + 1) * features_per_section:
+                    current_section = min(current_section + 1, 3)
+
+    logger.info(f"Added {len(homeplan['includedFeatures'])} included features for plan: {homeplan['name']}")
+
+    # Extract half baths and number of stories in one pass over the detail columns
+    stories = None
+    for col in PLAN_COLUMN_XPATH(plan_root):
+        h3 = col.find('.//h3')
+        label = h3.text_content().strip() if h3 is not None else None
+        if label == 'Half Bathrooms' and homeplan["details"]["half_baths"] is None:
+            span = first(NEXT_SPAN_XPATH(h3))
+            if span is not None:
+                homeplan["details"]["half_baths"] = span.text_content().strip()
+        elif label == 'Stories' and stories is None:
+            span = first(NEXT_SPAN_XPATH(h3))
+            if span is not None:
+                try:
+                    stories = int(span.text_content().strip())
+                except ValueError:
+                    continue
+
+    # Generate floorplan entries based on number of stories
+    if stories is not None and stories > 0:
+        # Find the floorplan image in tabs-content once; every floor shares it
+        tabs_content = first(plan_root.xpath(f"//div[{has_class('tabs-content')}]"))
+        img = first(TABS_PANEL_XPATH(tabs_content)).find('.//img') if tabs_content is not None else None
+        src = (img.get('src') or img.get('data-csrc')) if img is not None else None
+        if src:
+            for i in range(1, stories + 1):
+                if i == 1:
+                    floor_name = "1st Floor Floorplan"
+                elif i == 2:
+                    floor_name = "2nd Floor Floorplan"
+                elif i == 3:
+                    floor_name = "3rd Floor Floorplan"
+                else:
+                    floor_name = f"{i}th Floor Floorplan"
+                homeplan["floorplan_images"].append({
+                    "name": floor_name,
+                    "image_url": src
+                })
+
+def save_debug_html(html_file, root, writer=None):
+    """Write a parsed detail page back out as HTML for debugging"""
+    write_file(html_file, lxml.html.tostring(root, encoding='utf-8'), writer)
+    logger.info(f"HTML saved to: {html_file}")
+
+def fetch_page(url, driver, session, output_dir='data/meritagehomes', debug_html=False, writer=None):
+    """Fetch and parse page data using an already running driver and HTTP session; debug_html also saves homesite/plan HTML, writer queues output files"""
     try:
-        # Generate output filename
+        # Generate output filenames; main() creates the output directories and skips finished URLs
         community_name = url.split('/')[-1]
-        json_file = f"{output_dir}/json/meritage_{community_name}.json"
-        
-        # Check if file already exists
-        if os.path.exists(json_file):
-            logger.info(f"JSON file already exists: {json_file}, skipping...")
-            return None
+        json_file = json_path(url, output_dir)
             
         logger.info(f"Processing URL: {url}")
-        driver = setup_driver()
+        driver.delete_all_cookies()  # Avoid session state carrying over between communities
         driver.get(url)
-        time.sleep(5)  # Wait for page load
+        wait_for(driver, 'div.community-detail-overview article h1')
         
         # Save HTML
-        os.makedirs(f"{output_dir}/html", exist_ok=True)
-        os.makedirs(f"{output_dir}/json", exist_ok=True)
         html_file = f"{output_dir}/html/meritage_{community_name}.html"
-        with open(html_file, 'w', encoding='utf-8') as f:
-            f.write(driver.page_source)
+        page_source = driver.page_source
+        write_file(html_file, page_source.encode('utf-8'), writer)
         logger.info(f"HTML saved to: {html_file}")
 
         # Parse data
-        soup = BeautifulSoup(driver.page_source, 'html.parser')
+        root = lxml.html.fromstring(page_source)
         data = {
             "timestamp": datetime.now().isoformat(),
             "name": None,
@@ -109,7 +457,7 @@ def fetch_page(url, output_dir='data/meritagehomes'):
             "price_from": None,
             "address": None,
             "phone": None,
-            "description": extract_article_content(soup),
+            "description": extract_article_content(root),
             "images": [],
             "location": {
                 "latitude": None,
@@ -136,38 +484,52 @@ def fetch_page(url, output_dir='data/meritagehomes'):
         }
 
         # Extract community name
-        overview_section = soup.find('div', class_='community-detail-overview')
-        if overview_section:
-            h1_elem = overview_section.find('article').find('h1')
-            if h1_elem:
-                data["name"] = h1_elem.text.strip()
+        overview_section = first(root.xpath(f"//div[{has_class('community-detail-overview')}]"))
+        if overview_section is not None:
+            h1_elem = overview_section.find('.//article').find('.//h1')
+            if h1_elem is not None:
+                data["name"] = h1_elem.text_content().strip()
                 logger.info(f"Found community name: {data['name']}")
 
-        # Extract price from
-        price_text = soup.text
-        price_match = re.search(r'Starting at\s+(\$[\d,]+)', price_text)
+        # Extract price from and square footage range in a single scan of the page text
+        price_match = None
+        sqft_match = None
+        for match in PAGE_SUMMARY_RE.finditer(''.join(PAGE_TEXT_XPATH(root))):
+            if match.group('price') is not None:
+                price_match = price_match or match
+            else:
+                sqft_match = sqft_match or match
+            if price_match and sqft_match:
+                break
         if price_match:
-            data["price_from"] = f"From {price_match.group(1)}"
+            data["price_from"] = f"From {price_match.group('price')}"
             data["details"]["price_range"] = data["price_from"]
             logger.info(f"Found price: {data['price_from']}")
+        if sqft_match:
+            data["details"]["sqft_range"] = f"{sqft_match.group('sqft_min')} - {sqft_match.group('sqft_max')}"
+            logger.info(f"Found sqft range: {data['details']['sqft_range']}")
 
-        # Extract address
-        location_elem = soup.find('div', id='community-driving-directions--location')
-        if location_elem:
-            address_elem = location_elem.find('div', class_='has-dividers')
-            if address_elem and address_elem.find('p'):
-                data["address"] = address_elem.find('p').text.strip()
+        # Extract address and location coordinates
+        location_elem = first(root.xpath("//div[@id='community-driving-directions--location']"))
+        if location_elem is not None:
+            address_elem = first(location_elem.xpath(f".//div[{has_class('has-dividers')}]"))
+            address_p = address_elem.find('.//p') if address_elem is not None else None
+            if address_p is not None:
+                data["address"] = address_p.text_content().strip()
                 logger.info(f"Found address: {data['address']}")
+            data["location"]["latitude"] = location_elem.get('data-lat')
+            data["location"]["longitude"] = location_elem.get('data-long')
+            logger.info("Found location coordinates")
 
         # Extract description
-        meta_desc = soup.find('meta', attrs={'name': 'description'})
+        meta_desc = first(root.xpath("//meta[@name='description']"))
 
         # Extract first image
-        slides = soup.find_all('li', class_='slick-slide orbit-slide')
+        slides = SLIDE_XPATH(root)
         if slides:
             first_imageParent = slides[0]
-            first_image = first_imageParent.find('span', attrs={'data-lazy': True})
-            if first_image:
+            first_image = first_imageParent.find('.//span[@data-lazy]')
+            if first_image is not None:
                 src = first_image.get('src') or first_image.get('data-csrc')
                 if src:
                     if not src.startswith('http'):
@@ -175,57 +537,25 @@ def fetch_page(url, output_dir='data/meritagehomes'):
                         data["images"].append(src)
                         logger.info("Found first image")
 
-        # Extract location coordinates
-        location_elem = soup.find('div', id='community-driving-directions--location')
-        if location_elem:
-            data["location"]["latitude"] = location_elem.get('data-lat')
-            data["location"]["longitude"] = location_elem.get('data-long')
-            logger.info("Found location coordinates")
-
-        # Extract ranges for details
-        html_text = soup.text
-        # Square footage range
-        sqft_match = re.search(r'Approx\.\s+Sq\.\s+Ft\.\s+([\d,]+)\s*-\s*([\d,]+)', html_text)
-        if sqft_match:
-            data["details"]["sqft_range"] = f"{sqft_match.group(1)} - {sqft_match.group(2)}"
-            logger.info(f"Found sqft range: {data['details']['sqft_range']}")
-
-        # Find all columns with the specified class
-        columns = soup.find_all('div', class_='small-6 medium-6 large-3 column')
-        
-        # Extract bed range
-        for col in columns:
-            h3 = col.find('h3')
-            if h3 and h3.text.strip() == 'Bedrooms':
-                span = h3.find_next_sibling('span')
-                if span:
-                    data["details"]["bed_range"] = span.text.strip()
-                break
-        
-        # Extract bath range
-        for col in columns:
-            h3 = col.find('h3')
-            if h3 and h3.text.strip() == 'Full Bathrooms':
-                span = h3.find_next_sibling('span')
-                if span:
-                    data["details"]["bath_range"] = span.text.strip()
-                break
-        
-        # Extract stories range
-        for col in columns:
-            h3 = col.find('h3')
-            if h3 and h3.text.strip() == 'Stories':
-                span = h3.find_next_sibling('span')
-                if span:
-                    data["details"]["stories_range"] = span.text.strip()
-                break
+        # Extract bed, bath and stories ranges in one pass over the detail columns
+        seen_labels = set()
+        for col in DETAIL_COLUMN_XPATH(root):
+            h3 = col.find('.//h3')
+            label = h3.text_content().strip() if h3 is not None else None
+            if label in DETAIL_RANGE_FIELDS and label not in seen_labels:
+                # Only the first column with each label is used
+                seen_labels.add(label)
+                span = first(NEXT_SPAN_XPATH(h3))
+                if span is not None:
+                    data["details"][DETAIL_RANGE_FIELDS[label]] = span.text_content().strip()
 
         # Extract nearby places
-        for group in soup.find_all('div', class_='multicol'):
-            category = group.find('h5').text.strip() if group.find('h5') else None
-            for link in group.find_all('span', class_='plain'):
+        for group in NEARBY_GROUP_XPATH(root):
+            h5 = group.find('.//h5')
+            category = h5.text_content().strip() if h5 is not None else None
+            for link in NEARBY_PLACE_XPATH(group):
                 nearby = {
-                    "name": link.text.strip(),
+                    "name": link.text_content().strip(),
                     "category": category,
                     "distance": None,
                     "rating": None,
@@ -235,126 +565,72 @@ def fetch_page(url, output_dir='data/meritagehomes'):
             logger.info(f"Found {len(data['nearbyplaces'])} nearby places")
 
         # Extract homesites
-        qmi_section = soup.find('section', attrs={'aria-label': 'Quick Move Ins'})
-        if qmi_section:
-            for index, qmi in enumerate(qmi_section.find_all('div', class_='qmi-vertical')):
-                content = qmi.find('div', class_='content')
-                if content:
-                    mid = content.find('div', class_='mid')
-                    if mid:
-                        raw_address = mid.find('p').text.strip() if mid.find('p') else None
-                        # Clean up address formatting - remove newlines and extra spaces
-                        address = ' '.join(raw_address.split()) if raw_address else None
-                        homesite = {
-                            "address": address,
-                            "name": re.sub(r'\s+\d{5}$', '', address) if address else None,
-                            "plan": mid.find('h3').text.strip() if mid.find('h3') else None,
-                            "id": str(index + 1),
-                            "price": mid.find('div', class_='top-details').text.strip() if mid.find('div', class_='top-details') else None,
-                            "beds": f"{re.search(r'Bed\s+(\d+)', mid.find('div', class_='bottom-details').text).group(1)}bd" if mid.find('div', class_='bottom-details') and re.search(r'Bed\s+(\d+)', mid.find('div', class_='bottom-details').text) else None,
-                            "baths": f"{re.search(r'Bath\s+(\d+)', mid.find('div', class_='bottom-details').text).group(1)}ba" if mid.find('div', class_='bottom-details') and re.search(r'Bath\s+(\d+)', mid.find('div', class_='bottom-details').text) else None,
-                            "sqft": f"{re.search(r'Approx\.\s+([\d,]+)\s+sq\.\s+ft\.', mid.find('div', class_='bottom-details').text).group(1)} ft²" if mid.find('div', class_='bottom-details') and re.search(r'Approx\.\s+([\d,]+)\s+sq\.\s+ft\.', mid.find('div', class_='bottom-details').text) else None,
-                            "status": "Available",
-                            "image_url": None,
-                            "url": f"https://www.meritagehomes.com{mid.find('h3').find('a')['href']}" if mid.find('h3') and mid.find('h3').find('a') else None,
-                            "latitude": None,
-                            "longitude": None,
-                            "overview": None,
-                            "images": []
-                        }
-                        
-                        # Get image URL
-                        img_container = qmi.find('div', class_='image')
-                        if img_container and img_container.find('img'):
-                            img = img_container.find('img')
-                            src = img.get('src') or img.get('data-csrc')
-                            if src and not src.startswith('http'):
-                                src = 'https://www.meritagehomes.com' + src
-                            homesite["image_url"] = src
-
-                        # Fetch homesite detail page
-                        if homesite["url"]:
-                            try:
-                                site_name = homesite["url"].split('/')[-1]
-                                site_html_file = f"{output_dir}/html/meritage_homesite_{site_name}.html"
-                                
-                                # Save homesite page HTML
-                                driver.get(homesite["url"])
-                                time.sleep(3)  # Wait for page load
-                                with open(site_html_file, 'w', encoding='utf-8') as f:
-                                    f.write(driver.page_source)
-                                
-                                # Parse homesite page
-                                site_soup = BeautifulSoup(driver.page_source, 'html.parser')
-                                
-                                # Extract coordinates and overview from article
-                                content_section = site_soup.find('article', attrs={'class': 'small-12 medium-10 large-8 column text-center pad-bottom-2'})
-                                if content_section:
-                                    # Find map link and extract coordinates
-                                    map_link = content_section.find('a', {'class': 'plain', 'href': lambda x: x and 'maps.google.com' in x})
-                                    if map_link and 'href' in map_link.attrs:
-                                        coords_match = re.search(r'daddr=([-\d.]+),([-\d.]+)', map_link['href'])
-                                        if coords_match:
-                                            homesite["latitude"] = coords_match.group(1)
-                                            homesite["longitude"] = coords_match.group(2)
-                                            logger.info(f"Found coordinates: {homesite['latitude']}, {homesite['longitude']}")
-                                    
-                                    # Extract overview - it's the p tag that contains text about the home description
-                                    paragraphs = content_section.find_all('p')
-                                    for p in paragraphs:
-                                        # Skip paragraphs that are just plan numbers or contain specific headers
-                                        if not p.text.strip().startswith('Plan #') and 'Estimated Completion' not in p.text and 'Home Address' not in p.text:
-                                            homesite["overview"] = p.text.strip()
-                                            logger.info(f"Found overview: {homesite['overview'][:50]}...")
-                                            break
-                                
-                                # Extract images - handle both regular and lazy loaded images
-                                for slide in site_soup.find_all('li', class_='slick-slide orbit-slide'):
-                                    # First try to get lazy loaded image
-                                    hidden_img = slide.find('span', class_='hidden-image')
-                                    if hidden_img and hidden_img.get('data-lazy'):
-                                        src = hidden_img.get('data-lazy')
-                                        if src and not src.startswith('http'):
-                                            src = 'https://www.meritagehomes.com' + src
-                                        homesite["images"].append(src)
-                                    else:
-                                        # Try regular image as fallback
-                                        img = slide.find('img', class_='orbit-image')
-                                        if img:
-                                            src = img.get('src') or img.get('data-csrc')
-                                            if src and not src.startswith('http') and not src.endswith('meritageLoadingCommunityHero.gif'):
-                                                src = 'https://www.meritagehomes.com' + src
-                                                homesite["images"].append(src)
-                                
-                                logger.info(f"Found {len(homesite['images'])} images")
-                                
-                                # Delete the HTML file after extracting data
-                                if os.path.exists(site_html_file):
-                                    os.remove(site_html_file)
-                                    logger.info(f"Deleted HTML file: {site_html_file}")
-                                    
-                            except Exception as e:
-                                logger.error(f"Error processing homesite page {homesite['url']}: {str(e)}")
-                                # Try to delete HTML file even if there was an error
-                                if os.path.exists(site_html_file):
-                                    os.remove(site_html_file)
-                                    logger.info(f"Deleted HTML file after error: {site_html_file}")
-                            
-                        data["homesites"].append(homesite)
-                        logger.info(f"Added homesite: {homesite['name']}")
+        for index, qmi in enumerate(QMI_XPATH(root)):
+            content = first(CONTENT_XPATH(qmi))
+            if content is not None:
+                mid = first(MID_XPATH(content))
+                if mid is not None:
+                    address_p = mid.find('.//p')
+                    raw_address = address_p.text_content().strip() if address_p is not None else None
+                    # Clean up address formatting - remove newlines and extra spaces
+                    address = WS_RE.sub(' ', raw_address).strip() if raw_address else None
+                    
+                    # Look up each element once and scan the details text once
+                    h3 = mid.find('.//h3')
+                    link = h3.find('.//a') if h3 is not None else None
+                    top_details = first(TOP_DETAILS_XPATH(mid))
+                    bottom_details = first(BOTTOM_DETAILS_XPATH(mid))
+                    bottom_text = bottom_details.text_content() if bottom_details is not None else ''
+                    bottom = extract_bottom_details(bottom_text)
+                    homesite = {
+                        "address": address,
+                        "name": ZIP_TAIL_RE.sub('', address) if address else None,
+                        "plan": h3.text_content().strip() if h3 is not None else None,
+                        "id": str(index + 1),
+                        "price": top_details.text_content().strip() if top_details is not None else None,
+                        "beds": f"{bottom['bed']}bd" if 'bed' in bottom else None,
+                        "baths": f"{bottom['bath']}ba" if 'bath' in bottom else None,
+                        "sqft": f"{bottom['sqft']} ft²" if 'sqft' in bottom else None,
+                        "status": "Available",
+                        "image_url": None,
+                        "url": f"https://www.meritagehomes.com{link.attrib['href']}" if link is not None else None,
+                        "latitude": None,
+                        "longitude": None,
+                        "overview": None,
+                        "images": []
+                    }
+                    
+                    # Get image URL
+                    img_container = first(IMAGE_XPATH(qmi))
+                    img = img_container.find('.//img') if img_container is not None else None
+                    if img is not None:
+                        src = img.get('src') or img.get('data-csrc')
+                        if src and not src.startswith('http'):
+                            src = 'https://www.meritagehomes.com' + src
+                        homesite["image_url"] = src
+
+                    data["homesites"].append(homesite)
+                    logger.info(f"Added homesite: {homesite['name']}")
 
         # Extract home plans
-        for plan in soup.find_all('div', class_='row columns collapse floorplan-vertical'):
-            content = plan.find('div', class_='content')
+        for plan in PLAN_XPATH(root):
+            # Look up each element once and scan the details text once
+            content = first(CONTENT_XPATH(plan))
+            h3 = content.find('.//h3') if content is not None else None
+            link = h3.find('.//a') if h3 is not None else None
+            top_details = first(TOP_DETAILS_XPATH(plan))
+            bottom_details = first(BOTTOM_DETAILS_XPATH(plan))
+            bottom_text = bottom_details.text_content() if bottom_details is not None else ''
+            bottom = extract_bottom_details(bottom_text)
             homeplan = {
-                "name": content.find('h3').text.strip() if content and content.find('h3') else None,
-                "url": f"https://www.meritagehomes.com{content.find('h3').find('a')['href']}" if content and content.find('h3') and content.find('h3').find('a') else None,
+                "name": h3.text_content().strip() if h3 is not None else None,
+                "url": f"https://www.meritagehomes.com{link.attrib['href']}" if link is not None else None,
                 "details": {
-                    "price": plan.find('div', class_='top-details').text.strip() if plan.find('div', class_='top-details') else None,
-                    "beds": f"{re.search(r'Bed\s+(\d+)', plan.find('div', class_='bottom-details').text).group(1)}bd" if plan.find('div', class_='bottom-details') and re.search(r'Bed\s+(\d+)', plan.find('div', class_='bottom-details').text) else None,
-                    "baths": f"{re.search(r'Bath\s+(\d+)', plan.find('div', class_='bottom-details').text).group(1)}ba" if plan.find('div', class_='bottom-details') and re.search(r'Bath\s+(\d+)', plan.find('div', class_='bottom-details').text) else None,
+                    "price": top_details.text_content().strip() if top_details is not None else None,
+                    "beds": f"{bottom['bed']}bd" if 'bed' in bottom else None,
+                    "baths": f"{bottom['bath']}ba" if 'bath' in bottom else None,
                     "half_baths": None,
-                    "sqft": f"{re.search(r'Approx\.\s+([\d,]+)\s+sq\.\s+ft\.', plan.find('div', class_='bottom-details').text).group(1)} ft²" if plan.find('div', class_='bottom-details') and re.search(r'Approx\.\s+([\d,]+)\s+sq\.\s+ft\.', plan.find('div', class_='bottom-details').text) else None,
+                    "sqft": f"{bottom['sqft']} ft²" if 'sqft' in bottom else None,
                     "status": "Actively selling",
                     "image_url": None
                 },
@@ -363,13 +639,13 @@ def fetch_page(url, output_dir='data/meritagehomes'):
             }
             
             # Get image URL
-            img_container = plan.find('div', class_='image')
-            if img_container:
+            img_container = first(IMAGE_XPATH(plan))
+            if img_container is not None:
                 # Try to find image in lazy load script
-                lazy_script = img_container.find('script', {'type': 'text/lazyload'})
-                if lazy_script:
+                lazy_script = img_container.find(".//script[@type='text/lazyload']")
+                if lazy_script is not None:
                     # Extract src from the img tag inside script content
-                    img_match = re.search(r'<img[^>]*src="([^"]*)"', lazy_script.string)
+                    img_match = LAZY_IMG_SRC_RE.search(lazy_script.text)
                     if img_match:
                         src = img_match.group(1)
                         if src and not src.startswith('http'):
@@ -377,125 +653,41 @@ def fetch_page(url, output_dir='data/meritagehomes'):
                         homeplan["details"]["image_url"] = src
                 else:
                     # Try normal img tag as fallback
-                    img = img_container.find('img')
-                    if img:
+                    img = img_container.find('.//img')
+                    if img is not None:
                         src = img.get('src') or img.get('data-csrc')
                         if src and not src.startswith('http'):
                             src = 'https://www.meritagehomes.com' + src
                         homeplan["details"]["image_url"] = src
 
-            # Fetch homeplan detail page
+            data["homeplans"].append(homeplan)
+            logger.info(f"Added plan: {homeplan['name']}")
+
+        # Download all homesite and plan detail pages concurrently, then parse them in page order
+        subpage_urls = [record["url"] for record in data["homesites"] + data["homeplans"] if record["url"]]
+        downloaded = download_subpages(session, subpage_urls)
+
+        for homesite in data["homesites"]:
+            if homesite["url"]:
+                try:
+                    site_root = fetch_subpage(homesite["url"], driver, downloaded.get(homesite["url"]), 'article.small-12.medium-10.large-8', SITE_READY_XPATH)
+                    # Save homesite page HTML only when debugging
+                    if debug_html:
+                        save_debug_html(f"{output_dir}/html/meritage_homesite_{homesite['url'].split('/')[-1]}.html", site_root, writer)
+                    parse_homesite_page(homesite, site_root)
+                except Exception as e:
+                    logger.error(f"Error processing homesite page {homesite['url']}: {str(e)}")
+
+        for homeplan in data["homeplans"]:
             if homeplan["url"]:
                 try:
-                    plan_name = homeplan["url"].split('/')[-1]
-                    plan_html_file = f"{output_dir}/html/meritage_{plan_name}.html"
-                    
-                    # Save plan page HTML
-                    driver.get(homeplan["url"])
-                    time.sleep(3)  # Wait for page load
-                    with open(plan_html_file, 'w', encoding='utf-8') as f:
-                        f.write(driver.page_source)
-                    
-                    # Parse plan page
-                    plan_soup = BeautifulSoup(driver.page_source, 'html.parser')
-                    
-                    # Initialize includedFeatures array
-                    homeplan["includedFeatures"] = []
-                    
-                    # Extract included features from multicol decorated
-                    feature_sections = plan_soup.find_all('div', class_='small-12 large-6 column text align-middle text-left')
-                    logger.info(f"feature_sections------------: {feature_sections}")
-                    total_features = 0
-                    
-                    # First count total features to determine section distribution
-                    for section in feature_sections:
-                        if section.find('ul'):
-                            total_features += len(section.find('ul').find_all('li'))
-                            logger.info(f"total_features------------: {total_features}")
-                    
-                    # Calculate features per section (roughly divide by 4)
-                    features_per_section = total_features // 4 if total_features > 0 else 0
-                    logger.info(f"features_per_section------------: {features_per_section}")
-                    current_section = 0
-                    feature_count = 0
-                    
-                    # Extract features and assign section indexes
-                    for section in feature_sections:
-                        ul = section.find('ul')
-                        if ul:
-                            for li in ul.find_all('li'):
-                                feature_text = li.text.strip()
-                                if feature_text:
-                                    homeplan["includedFeatures"].append({
-                                        "description": feature_text,
-                                        "section_index": current_section
-                                    })
-                                    feature_count += 1
-                                    # Update section index when count exceeds per-section limit
-                                    if feature_count >= (current_section + 1) * features_per_section:
-                                        current_section = min(current_section + 1, 3)
-                    
-                    logger.info(f"Added {len(homeplan['includedFeatures'])} included features for plan: {homeplan['name']}")
-                    
-                    # Extract half baths
-                    for col in plan_soup.find_all('div', class_='small-6 medium-6 large-4 column'):
-                        h3 = col.find('h3')
-                        if h3 and h3.text.strip() == 'Half Bathrooms':
-                            span = h3.find_next_sibling('span')
-                            if span:
-                                homeplan["details"]["half_baths"] = span.text.strip()
-                                break
-                    
-                    # Get number of stories and generate floorplan images
-                    stories = None
-                    for col in plan_soup.find_all('div', class_='small-6 medium-6 large-4 column'):
-                        h3 = col.find('h3')
-                        if h3 and h3.text.strip() == 'Stories':
-                            span = h3.find_next_sibling('span')
-                            if span:
-                                try:
-                                    stories = int(span.text.strip())
-                                    # Generate floorplan entries based on number of stories
-                                    for i in range(1, stories + 1):
-                                        if i == 1:
-                                            floor_name = "1st Floor Floorplan"
-                                        elif i == 2:
-                                            floor_name = "2nd Floor Floorplan"
-                                        elif i == 3:
-                                            floor_name = "3rd Floor Floorplan"
-                                        else:
-                                            floor_name = f"{i}th Floor Floorplan"
-                                            
-                                        # Find corresponding image in tabs-content
-                                        tabs_content = plan_soup.find('div', class_='tabs-content')
-                                        if tabs_content:
-                                            panels = tabs_content.find('div', class_='tabs-panel')
-                                            img = panels.find('img')
-                                            if img:
-                                                src = img.get('src') or img.get('data-csrc')
-                                                if src:
-                                                    homeplan["floorplan_images"].append({
-                                                        "name": floor_name,
-                                                        "image_url": src
-                                                    })
-                                except ValueError:
-                                    continue
-                                break
-                    
-                    # Delete the HTML file after extracting data
-                    if os.path.exists(plan_html_file):
-                        os.remove(plan_html_file)
-                        logger.info(f"Deleted HTML file: {plan_html_file}")
-                                        
+                    plan_root = fetch_subpage(homeplan["url"], driver, downloaded.get(homeplan["url"]), 'div.tabs-content, div.small-12.large-6.column.text', PLAN_READY_XPATH)
+                    # Save plan page HTML only when debugging
+                    if debug_html:
+                        save_debug_html(f"{output_dir}/html/meritage_{homeplan['url'].split('/')[-1]}.html", plan_root, writer)
+                    parse_plan_page(homeplan, plan_root)
                 except Exception as e:
                     logger.error(f"Error processing plan page {homeplan['url']}: {str(e)}")
-                    # Try to delete HTML file even if there was an error
-                    if os.path.exists(plan_html_file):
-                        os.remove(plan_html_file)
-                        logger.info(f"Deleted HTML file after error: {plan_html_file}")
-                
-            data["homeplans"].append(homeplan)
-            logger.info(f"Added plan: {homeplan['name']}")
 
         # If main images array is empty, try to get an image from homeplans or homesites
         if not data["images"]:
@@ -519,29 +711,129 @@ def fetch_page(url, output_dir='data/meritagehomes'):
                 logger.info(f"Added random image to main images array from available images")
 
         # Save JSON
-        with open(json_file, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=2, ensure_ascii=False)
+        write_file(json_file, orjson.dumps(data, option=orjson.OPT_INDENT_2), writer, done_url=url)
         logger.info(f"Data saved to: {json_file}")
 
         return data
 
+    except (WebDriverException, requests.RequestException, etree.LxmlError, OSError) as e:
+        # Browser, network and disk failures are expected on long runs; log them without a traceback
+        logger.warning(f"Error processing page {url}: {str(e)}")
+        return None
     except Exception as e:
-        logger.error(f"Error processing page: {str(e)}")
+        # Anything else is a page layout the parser doesn't handle; tracebacks only when debugging
+        logger.error(f"Error processing page {url}: {str(e)}", exc_info=logger.isEnabledFor(logging.DEBUG))
         return None
-    finally:
-        if driver:
+
+class RateLimiter:
+    """Token bucket shared by batch threads: bursts of up to capacity calls, refilled at rate calls per second"""
+
+    def __init__(self, rate, capacity=1):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Block until a token is available and take it"""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                delay = (1 - self._tokens) / self.rate
+            time.sleep(delay)
+
+class BackgroundWriter:
+    """Single thread performing every batch output write and recording finished URLs in the done file"""
+
+    def __init__(self, done_file, done):
+        self._queue = queue.Queue(maxsize=WRITE_QUEUE_SIZE)
+        self._done_file = done_file
+        self._done = set(done)
+        self._thread = threading.Thread(target=self._run, name='output-writer', daemon=True)
+        self._thread.start()
+
+    def write(self, path, data, done_url=None):
+        """Queue bytes for path, blocking while the queue is full; done_url is marked finished only if the write succeeds"""
+        self._queue.put((path, data, done_url))
+
+    def close(self):
+        """Write everything queued, then stop the thread"""
+        self._queue.put(None)
+        self._thread.join()
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                break
+            path, data, done_url = item
             try:
-                driver.quit()
-            except Exception as e:
-                logger.error(f"Error closing driver: {str(e)}")
+                with open(path, 'wb', buffering=1 << 20) as f:
+                    f.write(data)
+            except OSError as e:
+                logger.error(f"Error writing {path}: {str(e)}")
+                continue
+            if done_url:
+                self._done.add(done_url)
+                try:
+                    save_done_urls(self._done_file, self._done)
+                except OSError as e:
+                    logger.error(f"Error writing {self._done_file}: {str(e)}")
+
+# Each batch thread drives its own browser; all of them are tracked so main() can quit them
+_thread_state = threading.local()
+_batch_drivers = []
+_batch_drivers_lock = threading.Lock()
+
+def get_thread_driver():
+    """Return the calling batch thread's driver, starting it on first use"""
+    driver = getattr(_thread_state, 'driver', None)
+    if driver is None:
+        driver = setup_driver()
+        _thread_state.driver = driver
+        with _batch_drivers_lock:
+            _batch_drivers.append(driver)
+    return driver
+
+def quit_batch_drivers():
+    """Quit every driver started by batch threads"""
+    with _batch_drivers_lock:
+        drivers = list(_batch_drivers)
+        _batch_drivers.clear()
+    for driver in drivers:
+        try:
+            driver.quit()
+        except Exception as e:
+            logger.error(f"Error closing driver: {str(e)}")
+
+def fetch_page_task(url, session, limiter, writer, output_dir, debug_html):
+    """Process one URL on a batch thread with that thread's driver, once the rate limiter allows it"""
+    if limiter:
+        limiter.acquire()
+    return fetch_page(url, get_thread_driver(), session, output_dir, debug_html, writer)
 
 def main():
     """Main function"""
+    driver = None
+    session = None
     try:
         # Parse command line arguments
         parser = argparse.ArgumentParser(description='Scrape Meritage community pages')
         parser.add_argument('--url', help='Process a single URL')
         parser.add_argument('--batch', action='store_true', help='Process all URLs from meritage_links.json')
+        parser.add_argument('--workers', type=int, default=max(1, (os.cpu_count() or 2) // 2),
+                            help='Number of concurrent browsers for --batch (default: half the CPU count)')
+        parser.add_argument('--rate', type=float, default=0.5,
+                            help='Maximum community pages started per second in --batch, 0 for no limit (default: 0.5); '
+                                 f'their detail pages share {SUBPAGE_CONCURRENCY} concurrent downloads')
+        parser.add_argument('--debug-html', action='store_true',
+                            help='Also save the HTML of every homesite and plan page')
         args = parser.parse_args()
 
         # Ensure output directories exist
@@ -578,17 +870,49 @@ def main():
                     logger.error("No URLs found in meritage_links.json")
                     return
                 
-                logger.info(f"Found {len(urls)} URLs to process")
-                
-                # Process each URL
-                for i, url in enumerate(urls, 1):
-                    try:
-                        logger.info(f"Processing URL {i}/{len(urls)}")
-                        fetch_page(url, output_dir)
-                        time.sleep(2)  # Add delay to avoid too frequent requests
-                    except Exception as e:
-                        logger.error(f"Failed to process URL {url}: {str(e)}")
+                # Canonicalize and dedupe, skipping communities finished by an earlier run
+                done_file = os.path.join(output_dir, DONE_FILE)
+                done = load_done_urls(done_file)
+                seen = set(done)
+                pending = []
+                for url in urls:
+                    url = canonical_url(url)
+                    if url in seen:
                         continue
+                    seen.add(url)
+                    if not os.path.exists(json_path(url, output_dir)):
+                        pending.append(url)
+                if len(pending) < len(urls):
+                    logger.info(f"Skipping {len(urls) - len(pending)} duplicate or already processed URLs")
+                urls = pending
+                if not urls:
+                    logger.info("All URLs already processed")
+                    return
+                
+                logger.info(f"Found {len(urls)} URLs to process with {args.workers} workers")
+                
+                # Process URLs on worker threads, one long-lived browser per thread and one shared HTTP session
+                session = make_session()
+                # Let every worker start at once, then pace new pages at --rate
+                limiter = RateLimiter(args.rate, capacity=args.workers) if args.rate > 0 else None
+                # The writer marks a URL done only after its JSON is written, so failed writes are retried next run
+                writer = BackgroundWriter(done_file, done)
+                executor = ThreadPoolExecutor(max_workers=args.workers)
+                try:
+                    futures = {executor.submit(fetch_page_task, url, session, limiter, writer, output_dir, args.debug_html): url for url in urls}
+                    for i, future in enumerate(as_completed(futures), 1):
+                        url = futures[future]
+                        try:
+                            future.result()
+                        except (WebDriverException, requests.RequestException, OSError) as e:
+                            # fetch_page handles its own errors; this is a driver that failed to start
+                            logger.warning(f"Failed to process URL {url}: {str(e)}")
+                        logger.info(f"Finished URL {i}/{len(urls)}: {url}")
+                finally:
+                    # Drop queued URLs on interrupt, then quit the browsers once running pages finish
+                    executor.shutdown(wait=True, cancel_futures=True)
+                    quit_batch_drivers()
+                    writer.close()
                         
             except Exception as e:
                 logger.error(f"Error during batch processing: {str(e)}")
@@ -597,20 +921,35 @@ def main():
                 
         elif args.url:
             # Process specified URL
-            fetch_page(args.url, output_dir)
+            json_file = json_path(args.url, output_dir)
+            if os.path.exists(json_file):
+                logger.info(f"JSON file already exists: {json_file}, skipping...")
+                return
+            driver = setup_driver()
+            session = make_session()
+            fetch_page(args.url, driver, session, output_dir, args.debug_html)
         else:
             # Process default URL
-            default_urls = [
-                "https://www.meritagehomes.com/state/al/huntsville/madison-preserve-the-estate-series",
-                "https://www.meritagehomes.com/state/az/phoenix/heritage-at-maricopa",
-                "https://www.meritagehomes.com/state/ca/sacramento/madison-at-ten-trails"
-            ]
-            default_url = default_urls[0]  # Use first URL as default
-            fetch_page(default_url, output_dir)
+            default_url = DEFAULT_URLS[0]  # Use first URL as default
+            json_file = json_path(default_url, output_dir)
+            if os.path.exists(json_file):
+                logger.info(f"JSON file already exists: {json_file}, skipping...")
+                return
+            driver = setup_driver()
+            session = make_session()
+            fetch_page(default_url, driver, session, output_dir, args.debug_html)
         
     except Exception as e:
         logger.error(f"Main program execution error: {str(e)}")
         logger.exception("Detailed error information:")
+    finally:
+        if session:
+            session.close()
+        if driver:
+            try:
+                driver.quit()
+            except Exception as e:
+                logger.error(f"Error closing driver: {str(e)}")
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file